@@ -1,6 +1,7 @@
 """Phase 4: Equation Formulation
 
-This module builds the system of equations for circuit analysis:
+This module builds the system of equations for circuit analysis
+as a linear system A(s) * x = rhs(s):
 - KCL equations from Cut Set Matrix
 - KVL equations from Tie Set Matrix
 - V-I relations for each component in s-domain
@@ -9,14 +10,49 @@ Author: Circuit Solver Project
 Date: 2025
 """
 
+from functools import lru_cache
+
 import sympy
+import numpy as np
+
+from .symbols import s, branch_symbols
+from .graph_builder import R_CODE, L_CODE, C_CODE, V_CODE, I_CODE
+
+
+# V-I relation builders by type code: value -> (V coefficient, I coefficient, rhs)
+_BUILDER = {
+    R_CODE: lambda v: (1, -v, 0),             # Resistor: V - I·R = 0
+    L_CODE: lambda v: (1, -s * v, 0),         # Inductor: V - I·sL = 0 (zero initial conditions)
+    C_CODE: lambda v: (1, -1 / (s * v), 0),   # Capacitor: V - I/(sC) = 0
+    V_CODE: lambda v: (1, 0, v / s),          # Voltage Source: V = Vs/s (step input)
+    I_CODE: lambda v: (0, 1, v / s),          # Current Source: I = Is/s (step input)
+}
+
+
+@lru_cache(maxsize=None)
+def _vi_row(code, value):
+    """
+    Returns the V-I relation coefficients for one component.
+    
+    Cached, so components sharing a type and value reuse the same
+    SymPy expressions.
+    
+    Args:
+        code (int): Component type code
+        value (float): Component value
+    
+    Returns:
+        tuple: (V coefficient, I coefficient, rhs entry)
+    """
+    return _BUILDER[code](sympy.nsimplify(value, rational=True))
 
 
-def build_equations(sorted_branches, Q, B, n_twigs, n_links):
+def build_equations(table, order, Q, B, n_twigs, n_links):
     """
     Builds the complete system of equations in the Laplace domain.
     
-    Creates symbolic equations for:
+    The system is linear in the branch unknowns x = [V | I], so it is
+    assembled directly as the sparse tableau A(s) * x = rhs(s):
     1. KCL (Kirchhoff's Current Law): Q * I = 0
     2. KVL (Kirchhoff's Voltage Law): B * V = 0
     3. V-I Relations for each component:
@@ -26,66 +62,62 @@ def build_equations(sorted_branches, Q, B, n_twigs, n_links):
        - Voltage Source: V = Vs/s
        - Current Source: I = Is/s
     
+    Component values are converted to exact rationals so the solver
+    can work over the field of rational functions in s.
+    
     Args:
-        sorted_branches (list): List of branch dicts [twigs + links]
-        Q (np.array): Cut set matrix (n_twigs x n_branches)
-        B (np.array): Tie set matrix (n_links x n_branches)
+        table (BranchTable): Branches of the circuit
+        order (np.array): Branch permutation [twigs + links]
+        Q (np.array): int8 cut set matrix (n_twigs x n_branches)
+        B (np.array): int8 tie set matrix (n_links x n_branches)
         n_twigs (int): Number of tree branches
         n_links (int): Number of co-tree branches
     
     Returns:
-        tuple: (equations, unknowns)
-            - equations: List of SymPy equations
+        tuple: (A, rhs, unknowns)
+            - A: SymPy coefficient matrix (2b x 2b)
+            - rhs: SymPy right-hand side vector (2b x 1)
             - unknowns: List of SymPy symbols (V and I for each branch)
     """
-    s = sympy.symbols('s')  # Laplace variable
+    n_branches = len(order)
     
-    # Create symbolic variables for branch voltages and currents
-    V_sym = [sympy.symbols(f'V_{b["id"]}') for b in sorted_branches]
-    I_sym = [sympy.symbols(f'I_{b["id"]}') for b in sorted_branches]
+    # Branch data in column order
+    ids = table.ids[order]
+    b_type = table.b_type[order]
+    b_value = table.b_value[order]
     
-    equations = []
+    # Symbolic variables for branch voltages and currents
+    V_sym = [branch_symbols(b_id)[0] for b_id in ids]
+    I_sym = [branch_symbols(b_id)[1] for b_id in ids]
+    
+    # Q and B only hold {-1, 0, +1}: their entries become SymPy Integers
+    # (built from the arrays directly, so empty blocks keep their width)
+    Qm = sympy.Matrix(np.asarray(Q, dtype=np.int8))
+    Bm = sympy.Matrix(np.asarray(B, dtype=np.int8))
     
     # ========== KCL Equations: Q * I = 0 ==========
-    for i in range(n_twigs):
-        eqn = 0
-        for j in range(len(sorted_branches)):
-            eqn += Q[i, j] * I_sym[j]
-        equations.append(eqn)
+    kcl = sympy.Matrix.hstack(sympy.zeros(n_twigs, n_branches), Qm)
     
     # ========== KVL Equations: B * V = 0 ==========
-    for i in range(n_links):
-        eqn = 0
-        for j in range(len(sorted_branches)):
-            eqn += B[i, j] * V_sym[j]
-        equations.append(eqn)
+    kvl = sympy.Matrix.hstack(Bm, sympy.zeros(n_links, n_branches))
+    
+    # Columns: V_0..V_(b-1), then I_0..I_(b-1); the V-I rows start
+    # empty and are filled per component below
+    A = sympy.Matrix.vstack(kcl, kvl, sympy.zeros(n_branches, 2 * n_branches))
+    rhs = sympy.zeros(2 * n_branches, 1)
     
     # ========== V-I Relations (Component Equations) ==========
-    for i, b in enumerate(sorted_branches):
-        val = b['value']
-        type_ = b['type']
-        
-        if type_ == 'R':
-            # Resistor: V = I·R
-            equations.append(V_sym[i] - I_sym[i] * val)
-            
-        elif type_ == 'L':
-            # Inductor: V = I·sL (zero initial conditions)
-            equations.append(V_sym[i] - I_sym[i] * s * val)
-            
-        elif type_ == 'C':
-            # Capacitor: V = I/(sC)
-            equations.append(V_sym[i] - I_sym[i] * (1 / (s * val)))
-            
-        elif type_ == 'V':
-            # Voltage Source: V = Vs/s (step input)
-            equations.append(V_sym[i] - val / s)
-            
-        elif type_ == 'I':
-            # Current Source: I = Is/s (step input)
-            equations.append(I_sym[i] - val / s)
+    row0 = n_twigs + n_links
+    for i, (code, value) in enumerate(zip(b_type.tolist(), b_value.tolist())):
+        a_v, a_i, r = _vi_row(code, value)
+        if a_v:
+            A[row0 + i, i] = a_v
+        if a_i:
+            A[row0 + i, n_branches + i] = a_i
+        if r:
+            rhs[row0 + i] = r
     
     # Combine all unknowns
     unknowns = V_sym + I_sym
     
-    return equations, unknowns
+    return A, rhs, unknowns
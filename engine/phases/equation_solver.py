@@ -1,31 +1,41 @@
 """Phase 5: Symbolic Equation Solving
 
-This module solves the system of equations using SymPy's
-symbolic solver to obtain s-domain solutions.
+This module solves the linear system A(s) * x = rhs(s) to obtain
+s-domain solutions. The system is solved directly by LU decomposition
+over the field of rational functions in s instead of SymPy's
+general-purpose solve().
 
 Author: Circuit Solver Project
 Date: 2025
 """
 
 import sympy
+from sympy.polys.matrices import DomainMatrix
 
 
-def solve_equations(equations, unknowns):
+def solve_equations(A, rhs, unknowns):
     """
     Solves the system of symbolic equations in the Laplace domain.
     
-    Uses SymPy's solve() function to find symbolic expressions
-    for all voltages and currents in terms of s.
+    The coefficients are exact rational functions of s, so LU
+    decomposition over QQ(s) keeps every entry a reduced fraction
+    N(s)/D(s) during elimination (floating-point coefficients cannot
+    cancel common factors and blow up in degree). The solutions are
+    returned with floating-point coefficients.
     
     Args:
-        equations (list): List of SymPy equations
+        A (sympy.Matrix): Coefficient matrix from the equation builder
+        rhs (sympy.Matrix): Right-hand side vector
         unknowns (list): List of SymPy symbols to solve for
     
     Returns:
         dict: Solution dictionary mapping symbols to s-domain expressions
             Example: {V_R1: 10/(s*(s+2)), I_R1: 2/(s+2), ...}
     """
-    # Solve the system symbolically
-    sol = sympy.solve(equations, unknowns)
+    # Solve over the fraction field QQ(s)
+    Ab = DomainMatrix.from_Matrix(A.row_join(rhs)).to_field()
+    x = Ab[:, :-1].lu_solve(Ab[:, -1:]).to_Matrix()
     
-    return sol
+    # Back to floating-point coefficients: the inverse Laplace transform
+    # then works with numeric poles instead of radicals
+    return {var: sympy.nfloat(expr) for var, expr in zip(unknowns, x)}
@@ -1,13 +1,113 @@
 """Phase 1: Graph Construction & Validation
 
 This module converts circuit data into a NetworkX graph representation
-and validates connectivity.
+and validates connectivity. It also packs the branches into a
+structure-of-arrays table used by the later phases.
 
 Author: Circuit Solver Project
 Date: 2025
 """
 
+from dataclasses import dataclass
+
 import networkx as nx
+import numpy as np
+
+
+# Integer codes for component types
+R_CODE, L_CODE, C_CODE, V_CODE, I_CODE = range(5)
+TYPE_CODES = {'R': R_CODE, 'L': L_CODE, 'C': C_CODE, 'V': V_CODE, 'I': I_CODE}
+
+
+@dataclass
+class BranchTable:
+    """
+    Branches stored as parallel arrays (one entry per branch, in input order).
+    
+    Attributes:
+        nodes (list): Node identifiers; b_from/b_to index into this list
+        ids (np.array): Branch identifiers (object array)
+        b_from (np.array): Source node index of each branch (int32)
+        b_to (np.array): Destination node index of each branch (int32)
+        b_type (np.array): Component type code of each branch (uint8)
+        b_value (np.array): Component value of each branch (float64)
+    """
+    nodes: list
+    ids: np.ndarray
+    b_from: np.ndarray
+    b_to: np.ndarray
+    b_type: np.ndarray
+    b_value: np.ndarray
+    
+    @classmethod
+    def from_branches(cls, nodes, branches):
+        """
+        Builds the table from a list of branch dictionaries.
+        
+        The branches must already be validated (known nodes and types,
+        numeric values), as build_graph does.
+        
+        Args:
+            nodes (list): List of node identifiers
+            branches (list): List of branch dictionaries
+        
+        Returns:
+            BranchTable: Table with one entry per branch
+        """
+        node_map = {n: i for i, n in enumerate(nodes)}
+        n_branches = len(branches)
+        
+        ids = np.empty(n_branches, dtype=object)
+        ids[:] = [b['id'] for b in branches]
+        
+        return cls(
+            nodes=list(nodes),
+            ids=ids,
+            b_from=np.fromiter((node_map[b['from']] for b in branches), dtype=np.int32, count=n_branches),
+            b_to=np.fromiter((node_map[b['to']] for b in branches), dtype=np.int32, count=n_branches),
+            b_type=np.fromiter((TYPE_CODES[b['type']] for b in branches), dtype=np.uint8, count=n_branches),
+            b_value=np.fromiter((b['value'] for b in branches), dtype=np.float64, count=n_branches)
+        )
+
+
+def _validate_branches(nodes, branches):
+    """
+    Checks that every branch has a known type, known end nodes and a
+    numeric value.
+    
+    Args:
+        nodes (list): List of node identifiers
+        branches (list): List of branch dictionaries
+    
+    Returns:
+        dict or None: Error information for the first invalid branch,
+            None if all branches are valid
+    """
+    node_set = set(nodes)
+    
+    for b in branches:
+        if b['type'] not in TYPE_CODES:
+            return {
+                "status": "error",
+                "message": f"Unknown component type '{b['type']}' for branch {b['id']}. Supported types: R, L, C, V, I."
+            }
+        
+        for end in (b['from'], b['to']):
+            if end not in node_set:
+                return {
+                    "status": "error",
+                    "message": f"Branch {b['id']} connects to unknown node '{end}'. All branch ends must be listed in 'nodes'."
+                }
+        
+        try:
+            float(b['value'])
+        except (TypeError, ValueError):
+            return {
+                "status": "error",
+                "message": f"Invalid value '{b['value']}' for branch {b['id']}. Component values must be numeric."
+            }
+    
+    return None
 
 
 def build_graph(circuit_data):
@@ -25,8 +125,9 @@ def build_graph(circuit_data):
                 - value: Component value (numeric)
     
     Returns:
-        tuple: (graph, error_dict or None)
+        tuple: (graph, table, error_dict or None)
             - graph: NetworkX MultiGraph object (or None if error)
+            - table: BranchTable of the branches (or None if error)
             - error_dict: Error information if validation fails, None otherwise
     
     Raises:
@@ -35,6 +136,11 @@ def build_graph(circuit_data):
     nodes = circuit_data['nodes']
     branches = circuit_data['branches']
     
+    # Validate branch data before anything is built from it
+    error = _validate_branches(nodes, branches)
+    if error:
+        return None, None, error
+    
     # Create MultiGraph (allows multiple edges between same nodes)
     G = nx.MultiGraph()
     G.add_nodes_from(nodes)
@@ -51,9 +157,9 @@ def build_graph(circuit_data):
     
     # Validate connectivity
     if not nx.is_connected(G):
-        return None, {
+        return None, None, {
             "status": "error",
             "message": "Circuit is not connected. All nodes must form a connected graph with node '0' as reference."
         }
     
-    return G, None
+    return G, BranchTable.from_branches(nodes, branches), None
@@ -10,9 +10,10 @@ Date: 2025
 """
 
 import numpy as np
+from scipy import sparse
 
 
-def get_incidence_matrix(graph, nodes, branches):
+def get_incidence_matrix(table, order):
     """
     Generates the reduced incidence matrix for the circuit.
     
@@ -24,43 +25,79 @@ def get_incidence_matrix(graph, nodes, branches):
     The reduced matrix excludes the reference node (usually '0').
     
     Args:
-        graph (nx.MultiGraph): Circuit graph
-        nodes (list): List of node identifiers
-        branches (list): List of branch dictionaries (should be sorted)
+        table (BranchTable): Branches of the circuit
+        order (np.array): Branch permutation giving the column order
+            (twigs first, then links)
     
     Returns:
         tuple: (A_reduced, A_full, ref_node_idx)
-            - A_reduced: (n-1) x b matrix
-            - A_full: n x b matrix
+            - A_reduced: (n-1) x b sparse CSR matrix
+            - A_full: n x b sparse CSR matrix
             - ref_node_idx: Index of reference node that was removed
     """
-    node_map = {n: i for i, n in enumerate(nodes)}
-    branch_map = {b['id']: i for i, b in enumerate(branches)}
-    
+    nodes = table.nodes
     n_nodes = len(nodes)
-    n_branches = len(branches)
+    n_branches = len(order)
     
-    # Initialize full incidence matrix
-    A_full = np.zeros((n_nodes, n_branches))
+    # Node indices of every branch, in column order
+    u_idx = np.take(table.b_from, order)
+    v_idx = np.take(table.b_to, order)
+    b_idx = np.arange(n_branches, dtype=np.int32)
     
-    # Fill matrix based on branch connections
-    for b in branches:
-        u, v = b['from'], b['to']
-        b_idx = branch_map[b['id']]
-        u_idx = node_map[u]
-        v_idx = node_map[v]
-        
-        # Current leaves u (+1), enters v (-1)
-        A_full[u_idx, b_idx] = 1
-        A_full[v_idx, b_idx] = -1
+    # Current leaves u (+1), enters v (-1): two non-zeros per column
+    rows = np.concatenate([u_idx, v_idx])
+    cols = np.concatenate([b_idx, b_idx])
+    data = np.concatenate([np.ones(n_branches, dtype=np.int8), -np.ones(n_branches, dtype=np.int8)])
+    A_full = sparse.coo_matrix((data, (rows, cols)), shape=(n_nodes, n_branches)).tocsr()
     
     # Remove reference node row (node '0' if present, else last node)
-    ref_node_idx = node_map.get('0', n_nodes - 1)
-    A_reduced = np.delete(A_full, ref_node_idx, axis=0)
+    ref_node_idx = nodes.index('0') if '0' in nodes else n_nodes - 1
+    A_reduced = A_full[np.arange(n_nodes) != ref_node_idx]
     
     return A_reduced, A_full, ref_node_idx
 
 
+def _int_gauss_jordan(A_t, A_l):
+    """
+    Computes (A_t)^(-1) * A_l exactly by integer Gauss-Jordan elimination.
+    
+    The incidence matrix is totally unimodular, so a nonsingular tree
+    submatrix can always be pivoted on ±1 entries and every intermediate
+    value stays in {-1, 0, +1}, so the elimination runs in int8 with no
+    floating-point rounding involved.
+    
+    Args:
+        A_t (np.array): Tree submatrix (n_twigs x n_twigs)
+        A_l (np.array): Link submatrix (n_twigs x n_links)
+    
+    Returns:
+        np.array: int8 matrix (A_t)^(-1) * A_l (n_twigs x n_links)
+    
+    Raises:
+        np.linalg.LinAlgError: If A_t is singular
+    """
+    n = A_t.shape[0]
+    M = np.hstack((A_t, A_l)).astype(np.int8)
+    
+    for c in range(n):
+        # Pivot on the first non-zero entry at or below the diagonal
+        candidates = np.flatnonzero(M[c:, c])
+        if candidates.size == 0:
+            raise np.linalg.LinAlgError("Singular matrix")
+        r = c + candidates[0]
+        M[[c, r]] = M[[r, c]]
+        if abs(M[c, c]) != 1:
+            raise np.linalg.LinAlgError("Tree submatrix is not unimodular")
+        
+        # Scale pivot row to +1, then clear the column in every other row
+        M[c] *= M[c, c]
+        factors = M[:, c].copy()
+        factors[c] = 0
+        M -= np.outer(factors, M[c])
+    
+    return M[:, n:]
+
+
 def get_cutset_matrix(A_red, n_twigs, n_links):
     """
     Generates the Cut Set Matrix from the incidence matrix.
@@ -68,34 +105,34 @@ def get_cutset_matrix(A_red, n_twigs, n_links):
     The Cut Set Matrix Q represents KCL equations:
     Q * I = 0 (current conservation at each node)
     
-    Formula: Q = [I | Q_l] where Q_l = -(A_t)^(-1) * A_l
+    Formula: Q = [I | Q_l] where Q_l = (A_t)^(-1) * A_l
+    (computed exactly, so Q is an int8 matrix)
     
     Args:
-        A_red (np.array): Reduced incidence matrix (n-1) x b
+        A_red (sparse.csr_matrix): Reduced incidence matrix (n-1) x b
         n_twigs (int): Number of tree branches
         n_links (int): Number of co-tree branches
     
     Returns:
         tuple: (Q, error_dict or None)
-            - Q: Cut set matrix (n_twigs x n_branches)
+            - Q: int8 cut set matrix (n_twigs x n_branches)
             - error_dict: Error information if matrix is singular, None otherwise
     """
     # Partition incidence matrix: A = [A_t | A_l]
     A_t = A_red[:, :n_twigs]  # Tree branches
     A_l = A_red[:, n_twigs:]  # Link branches
     
-    # Invert tree submatrix
+    # Eliminate tree submatrix in exact integer arithmetic
     try:
-        A_t_inv = np.linalg.inv(A_t)
+        Q_l = _int_gauss_jordan(A_t.toarray(), A_l.toarray())
     except np.linalg.LinAlgError as e:
         return None, {
             "status": "error",
             "message": f"Singular matrix error: Cannot invert tree submatrix. Check circuit topology. Details: {str(e)}"
         }
     
-    # Calculate Q_l and construct Q
-    Q_l = -np.dot(A_t_inv, A_l)
-    Q = np.hstack((np.eye(n_twigs), Q_l))
+    # Construct Q
+    Q = np.hstack((np.eye(n_twigs, dtype=np.int8), Q_l))
     
     return Q, None
 
@@ -115,9 +152,9 @@ def get_tieset_matrix(Q_l, n_twigs, n_links):
         n_links (int): Number of co-tree branches
     
     Returns:
-        np.array: Tie set matrix (n_links x n_branches)
+        np.array: int8 tie set matrix (n_links x n_branches)
     """
     B_t = -Q_l.T
-    B = np.hstack((B_t, np.eye(n_links)))
+    B = np.hstack((B_t, np.eye(n_links, dtype=np.int8)))
     
     return B
@@ -0,0 +1,36 @@
+"""Shared Symbols
+
+This module holds the SymPy symbols shared between phases so that every
+phase works with the same Symbol objects:
+- s: Laplace variable (Phases 4-6)
+- t: Time variable (Phase 6)
+- V_<id> / I_<id>: Branch voltage and current unknowns
+
+Author: Circuit Solver Project
+Date: 2025
+"""
+
+from functools import lru_cache
+
+import sympy
+
+
+s = sympy.Symbol('s')  # Laplace variable
+t = sympy.Symbol('t', positive=True, real=True)  # Time variable
+
+
+@lru_cache(maxsize=None)
+def branch_symbols(branch_id):
+    """
+    Returns the (voltage, current) symbols of a branch.
+    
+    Symbols are memoized per branch ID, so repeated solves reuse the
+    same objects and hit SymPy's expression caches.
+    
+    Args:
+        branch_id (str): Branch identifier
+    
+    Returns:
+        tuple: (V_<id>, I_<id>) SymPy symbols
+    """
+    return sympy.Symbol(f'V_{branch_id}'), sympy.Symbol(f'I_{branch_id}')
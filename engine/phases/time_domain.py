@@ -7,63 +7,379 @@ Author: Circuit Solver Project
 Date: 2025
 """
 
+import math
+
 import sympy
 import numpy as np
 
+from .symbols import s, t
+
+
+# Grids at least this long are evaluated with a numba-compiled function
+JIT_MIN_POINTS = 100_000
+
+# Roots of the denominator closer than this (relative) are treated as
+# one repeated pole
+POLE_TOL = 1e-4
+
+# Residue and pole components smaller than this (relative) are round-off
+CHOP_TOL = 1e-12
+
+# Grids at least this long (and shorter than JIT_MIN_POINTS, or not
+# compilable by numba) are evaluated with numexpr kernels
+NUMEXPR_MIN_POINTS = 10_000
+
+# Compiled evaluators keyed by the expressions they evaluate
+# (None marks expressions numba could not compile)
+_jit_cache = {}
+
+
+def _jit_evaluator(exprs):
+    """
+    Returns a numba-compiled evaluator for a list of time expressions.
+    
+    The expressions are lambdified for scalar t and the time grid is
+    walked in a parallel loop. Compiled functions are cached, so
+    repeated solves of the same circuit skip recompilation.
+    
+    Args:
+        exprs (list): SymPy expressions in t
+    
+    Returns:
+        callable or None: Function mapping a time array to a
+            (len(exprs), len(time)) array, or None if numba is not
+            installed or cannot compile the expressions
+    """
+    key = tuple(exprs)
+    if key in _jit_cache:
+        return _jit_cache[key]
+    
+    # Optional accelerator, imported only when a grid is wide enough
+    # (importing it costs more than evaluating a default grid)
+    try:
+        import numba
+    except ImportError:
+        return None
+    
+    try:
+        # Constants as floats keep the returned tuple homogeneous
+        exprs = tuple(sympy.Float(e) if e.is_Number else e for e in exprs)
+        scalar = numba.njit(sympy.lambdify(t, exprs, modules='math', cse=True))
+        n_exprs = len(exprs)
+        
+        @numba.njit(parallel=True)
+        def evaluate(time_points):
+            y = np.empty((n_exprs, time_points.size))
+            for k in numba.prange(time_points.size):
+                row = scalar(time_points[k])
+                for i in range(n_exprs):
+                    y[i, k] = row[i]
+            return y
+        
+        # Compile now so unsupported expressions fail here
+        evaluate(np.zeros(1))
+    
+    except Exception:
+        # numba rejects some SymPy output (complex constants, special functions)
+        evaluate = None
+    
+    _jit_cache[key] = evaluate
+    return evaluate
+
+
+def _numexpr_evaluator(exprs):
+    """
+    Returns a numexpr-based evaluator for a list of time expressions.
+    
+    Common subexpressions are extracted first, then each one and each
+    reduced expression is lambdified with the numexpr printer, so every
+    step runs as one fused multithreaded kernel and shared pole terms
+    are evaluated only once.
+    
+    Args:
+        exprs (list): SymPy expressions in t
+    
+    Returns:
+        callable or None: Function mapping a time array to a list of
+            arrays (one per expression), or None if numexpr is not
+            installed or cannot express them
+    """
+    # Optional accelerator, imported only when a grid is wide enough
+    try:
+        import numexpr  # Used by the lambdified functions
+    except ImportError:
+        return None
+    
+    try:
+        replacements, reduced = sympy.cse(exprs)
+        args = [t] + [sym for sym, _ in replacements]
+        steps = [sympy.lambdify(args, e, modules='numexpr') for _, e in replacements]
+        outputs = [sympy.lambdify(args, e, modules='numexpr') for e in reduced]
+    
+    except Exception:
+        # The numexpr printer rejects unsupported functions
+        return None
+    
+    def evaluate(time_points):
+        values = [time_points] + [None] * len(steps)
+        for k, step in enumerate(steps, start=1):
+            values[k] = step(*values)
+        return [f(*values) for f in outputs]
+    
+    return evaluate
+
+
+def _taylor(c, p, n):
+    """
+    First n Taylor coefficients of the polynomial c (descending
+    coefficients) about the point p.
+    """
+    return [np.polyval(np.polyder(c, k), p) / math.factorial(k) for k in range(n)]
+
+
+def _chop(z, scale):
+    """
+    Zeroes the real or imaginary part of z if it is negligible
+    (below CHOP_TOL) relative to scale.
+    """
+    re = z.real if abs(z.real) > CHOP_TOL * scale else 0.0
+    im = z.imag if abs(z.imag) > CHOP_TOL * scale else 0.0
+    return complex(re, im)
+
+
+def _pole_residues(expr):
+    """
+    Numerical partial-fraction expansion of a rational function of s.
+    
+    Poles are the roots of the denominator; roots closer than POLE_TOL
+    (relative) are merged into one repeated pole, as np.roots splits
+    repeated roots slightly. For a pole p of multiplicity m, the
+    residues of (s - p)^-m ... (s - p)^-1 are the Taylor coefficients
+    of num(s) / rest(s) about p, where rest is the denominator without
+    that pole. No symbolic partial fractions are involved, so the cost
+    is fixed by the degree and nearly coincident poles do not produce
+    huge cancelling residues.
+    
+    Args:
+        expr (sympy.Expr): s-domain expression
+    
+    Returns:
+        tuple or None: (terms, proper) where terms is a list of
+            (residue, pole, order) for the strictly proper part and
+            proper is False if a polynomial (direct) part was dropped,
+            or None if expr is not a rational function of s with
+            numeric coefficients
+    """
+    if not expr.is_rational_function(s):
+        return None
+    
+    num, den = sympy.fraction(sympy.together(expr))
+    try:
+        b = np.array([complex(c) for c in sympy.Poly(num, s).all_coeffs()])
+        a = np.array([complex(c) for c in sympy.Poly(den, s).all_coeffs()])
+    except (TypeError, sympy.PolynomialError):
+        return None
+    
+    # Split off the polynomial part (impulses at t = 0)
+    proper = len(b) < len(a)
+    if not proper:
+        _, b = np.polydiv(b, a)
+    if not np.any(b):
+        return [], proper
+    
+    # Group nearly equal roots into repeated poles
+    groups = []
+    for root in np.roots(a):
+        for group in groups:
+            center = np.mean(group)
+            if abs(root - center) <= POLE_TOL * max(1.0, abs(center)):
+                group.append(root)
+                break
+        else:
+            groups.append([root])
+    poles = [(np.mean(group), len(group)) for group in groups]
+    
+    terms = []
+    for i, (p, m) in enumerate(poles):
+        others = [p_j for j, (p_j, m_j) in enumerate(poles) if j != i for _ in range(m_j)]
+        rest = a[0] * np.atleast_1d(np.poly(others))
+        
+        # Series division: num(p + x) / rest(p + x) = sum_k c_k x^k
+        n_t, r_t = _taylor(b, p, m), _taylor(rest, p, m)
+        c = []
+        for k in range(m):
+            c.append((n_t[k] - sum(r_t[j] * c[k - j] for j in range(1, k + 1))) / r_t[0])
+        
+        # c_k is the residue of (s - p)^-(m - k)
+        terms.extend((c[k], p, m - k) for k in range(m))
+    
+    # Drop round-off: parts far below the largest residue or the pole's size
+    scale = max(abs(c) for c, _, _ in terms)
+    terms = [
+        (_chop(c, scale), _chop(p, max(1.0, abs(p))), k)
+        for c, p, k in terms
+        if abs(c) > CHOP_TOL * scale
+    ]
+    
+    return terms, proper
+
+
+def _ilt_rational(expr):
+    """
+    Inverse Laplace transform of a proper rational function of s.
+    
+    The poles and residues are found numerically and each term
+    c/(s - p)^k is mapped to c·t^(k-1)·e^(p·t)/(k-1)!. Complex-conjugate
+    pole pairs are combined into real e^(αt)·cos/sin terms.
+    
+    Args:
+        expr (sympy.Expr): s-domain expression
+    
+    Returns:
+        sympy.Expr or None: Time-domain expression, or None if expr is
+            not a proper rational function in s
+    """
+    expansion = _pole_residues(expr)
+    if expansion is None or not expansion[1]:
+        return None
+    
+    time_expr = sympy.S.Zero
+    for coeff, pole, order in expansion[0]:
+        envelope = t**(order - 1) / sympy.factorial(order - 1)
+        # Imaginary round-off is already chopped; unmerged conjugate
+        # pairs closer than POLE_TOL still take the pair branch below
+        if pole.imag == 0:
+            time_expr += float(coeff.real) * envelope * sympy.exp(float(pole.real) * t)
+        elif pole.imag > 0:
+            # c·e^(pt) + conj(c)·e^(conj(p)t) = 2·e^(αt)·(Re(c)·cos(βt) - Im(c)·sin(βt))
+            time_expr += envelope * sympy.exp(float(pole.real) * t) * (
+                2 * float(coeff.real) * sympy.cos(float(pole.imag) * t)
+                - 2 * float(coeff.imag) * sympy.sin(float(pole.imag) * t)
+            )
+    
+    return time_expr
+
+
+def _residue_response(expr, time_points):
+    """
+    Numerical time response of a rational function of s.
+    
+    The expression is expanded into poles and residues and each term
+    r/(s - p)^k is evaluated as r·t^(k-1)·e^(p·t)/(k-1)! directly on
+    the time grid. Direct (polynomial) terms are impulses at t = 0 and
+    are dropped, as they vanish for t > 0.
+    
+    Args:
+        expr (sympy.Expr): s-domain expression
+        time_points (np.array): Time values to evaluate at
+    
+    Returns:
+        np.array: Response values at time_points
+    """
+    expansion = _pole_residues(expr)
+    if expansion is None:
+        raise ValueError(f"Not a rational function of s: {expr}")
+    
+    y = np.zeros(time_points.shape, dtype=complex)
+    for r, p, order in expansion[0]:
+        y += r * time_points**(order - 1) * np.exp(p * time_points) / math.factorial(order - 1)
+    
+    return y.real
+
 
-def convert_to_time_domain(sol):
+def convert_to_time_domain(sol, time_points=None, fast=False):
     """
     Converts s-domain solutions to time-domain and evaluates numerically.
     
-    For each variable in the solution:
-    1. Apply inverse Laplace transform
-    2. Convert symbolic expression to numerical function
+    Steps:
+    1. Apply inverse Laplace transform to each variable
+       (partial-fraction expansion for rational functions)
+    2. Convert all expressions to a single numerical function
     3. Evaluate over time range [0, 10] seconds
     
+    Wide time grids (JIT_MIN_POINTS or more) are evaluated with a
+    numba-compiled function when numba is installed; grids of
+    NUMEXPR_MIN_POINTS or more use numexpr kernels when it is.
+    
+    With fast=True the symbolic inverse transform is skipped: results
+    holds the s-domain expressions and plot_data is computed
+    numerically from the residues and poles of each solution.
+    
     Args:
         sol (dict): Solution dictionary from equation solver
             Keys: SymPy symbols (V_*, I_*)
             Values: s-domain expressions
+        time_points (np.array, optional): Time values to evaluate at,
+            defaults to 100 points over [0, 10] seconds
+        fast (bool): Skip the symbolic inverse Laplace transform
     
     Returns:
         tuple: (results, plot_data)
             - results: Dict mapping variable names to time-domain expressions (strings)
             - plot_data: Dict mapping variable names to numerical arrays for plotting
     """
-    s = sympy.symbols('s')
-    t = sympy.symbols('t', positive=True, real=True)
-    
     results = {}
     plot_data = {}
+    time_exprs = {}
     
     # Time points for evaluation (0 to 10 seconds)
-    time_points = np.linspace(0, 10, 100)
+    if time_points is None:
+        time_points = np.linspace(0, 10, 100)
+    
+    if fast:
+        for var, expr in sol.items():
+            var_name = str(var)
+            results[var_name] = str(expr)
+            
+            try:
+                plot_data[var_name] = _residue_response(expr, time_points).tolist()
+            except Exception as e:
+                plot_data[var_name] = f"Plot error: {str(e)}"
+        
+        return results, plot_data, time_points
     
     for var, expr in sol.items():
         var_name = str(var)
         
-        # Apply inverse Laplace transform
+        # Apply inverse Laplace transform: partial fractions for rational
+        # functions, SymPy's general transform for anything else
         try:
-            time_expr = sympy.inverse_laplace_transform(expr, s, t)
+            time_expr = _ilt_rational(expr)
+            if time_expr is None:
+                time_expr = sympy.inverse_laplace_transform(expr, s, t)
             results[var_name] = str(time_expr)
-            
-            # Convert to numerical function for plotting
+            time_exprs[var_name] = time_expr
+        
+        except Exception as e:
+            results[var_name] = f"Cannot compute inverse Laplace: {str(e)}"
+    
+    # Convert all expressions to one numerical function for plotting;
+    # the responses share their poles, so CSE evaluates them only once
+    try:
+        func = None
+        if len(time_points) >= JIT_MIN_POINTS:
+            func = _jit_evaluator(list(time_exprs.values()))
+        if func is None and len(time_points) >= NUMEXPR_MIN_POINTS:
+            func = _numexpr_evaluator(list(time_exprs.values()))
+        if func is None:
+            func = sympy.lambdify(t, list(time_exprs.values()), modules='numpy', cse=True)
+        
+        # Evaluate at time points
+        y_rows = func(time_points)
+        
+        for var_name, y_vals in zip(time_exprs, y_rows):
+            # Handle scalar results (constants)
+            plot_data[var_name] = np.broadcast_to(y_vals, time_points.shape).tolist()
+    
+    except Exception:
+        # Evaluate one by one so an error only affects its own plot
+        for var_name, time_expr in time_exprs.items():
             try:
                 func = sympy.lambdify(t, time_expr, modules=['numpy'])
-                
-                # Evaluate at time points
                 y_vals = func(time_points)
-                
-                # Handle scalar results (constants)
-                if np.isscalar(y_vals):
-                    y_vals = np.full_like(time_points, y_vals)
-                
-                plot_data[var_name] = y_vals.tolist()
-                
+                plot_data[var_name] = np.broadcast_to(y_vals, time_points.shape).tolist()
+            
             except Exception as e:
                 plot_data[var_name] = f"Plot error: {str(e)}"
-        
-        except Exception as e:
-            results[var_name] = f"Cannot compute inverse Laplace: {str(e)}"
     
     return results, plot_data, time_points
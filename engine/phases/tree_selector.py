@@ -1,53 +1,71 @@
 """Phase 2: Spanning Tree Selection
 
 This module selects a spanning tree from the circuit graph using
-a weighted minimum spanning tree algorithm. Voltage sources are
-preferred in the tree, current sources in the co-tree.
+a greedy (Kruskal) pass over the branches in priority order. Voltage
+sources are preferred in the tree, current sources in the co-tree.
 
 Author: Circuit Solver Project
 Date: 2025
 """
 
-import networkx as nx
+import numpy as np
 
+from .graph_builder import R_CODE, L_CODE, C_CODE, V_CODE, I_CODE
 
-def select_tree(graph, branches):
+
+# Tree priority by component type code (lower is added to the tree first)
+TREE_PRIORITY = np.zeros(5, dtype=np.int8)
+TREE_PRIORITY[[V_CODE, R_CODE, L_CODE, C_CODE, I_CODE]] = [0, 1, 1, 1, 2]
+
+
+def select_tree(table):
     """
     Selects a spanning tree and partitions branches into twigs and links.
     
     Strategy:
-    - Voltage sources are assigned weight 0 (preferred in tree)
-    - Current sources are assigned weight 100 (preferred in co-tree)
-    - Other components are assigned weight 1
+    - Voltage sources are considered first (preferred in tree)
+    - Current sources are considered last (preferred in co-tree)
+    - Other components are considered in between, in input order
+    
+    A branch joins the tree when it connects two different components
+    of a disjoint-set forest over the nodes, which is Kruskal's
+    algorithm with the fixed weights above.
     
     Args:
-        graph (nx.MultiGraph): NetworkX graph of the circuit
-        branches (list): List of branch dictionaries
+        table (BranchTable): Branches of the circuit (validated as
+            connected by Phase 1)
     
     Returns:
-        tuple: (twigs, links, sorted_branches)
-            - twigs: List of branch dicts in the spanning tree
-            - links: List of branch dicts in the co-tree
-            - sorted_branches: Combined list [twigs + links]
+        tuple: (twigs, links, order)
+            - twigs: Indices of the branches in the spanning tree
+            - links: Indices of the branches in the co-tree
+            - order: Branch permutation [twigs + links]
     """
-    # Assign weights based on component type
-    for u, v, k, d in graph.edges(keys=True, data=True):
-        w = 1  # Default weight
-        if d['type'] == 'V':
-            w = 0  # Voltage sources preferred in tree
-        elif d['type'] == 'I':
-            w = 100  # Current sources preferred in co-tree
-        graph[u][v][k]['weight'] = w
-    
-    # Find minimum spanning tree
-    mst_edges = nx.minimum_spanning_edges(graph, keys=True, data=True, weight='weight')
-    tree_branch_ids = [e[2] for e in mst_edges]  # e[2] is the key (branch ID)
-    
-    # Partition branches
-    twigs = [b for b in branches if b['id'] in tree_branch_ids]
-    links = [b for b in branches if b['id'] not in tree_branch_ids]
+    parent = list(range(len(table.nodes)))
+    
+    def find(node):
+        # Find the set representative, compressing the path behind it
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while node != root:
+            parent[node], node = root, parent[node]
+        return root
+    
+    # Kruskal over branches ordered by type (stable sort keeps input order)
+    in_tree = np.zeros(len(table.ids), dtype=bool)
+    b_from, b_to = table.b_from.tolist(), table.b_to.tolist()
+    for i in np.argsort(TREE_PRIORITY[table.b_type], kind='stable').tolist():
+        u, v = find(b_from[i]), find(b_to[i])
+        if u != v:
+            parent[u] = v
+            in_tree[i] = True
+    
+    # Partition branches, keeping input order
+    twigs = np.flatnonzero(in_tree)
+    links = np.flatnonzero(~in_tree)
     
     # Combine: [Twigs first, Links second]
-    sorted_branches = twigs + links
+    order = np.concatenate((twigs, links))
     
-    return twigs, links, sorted_branches
+    return twigs, links, order
@@ -7,20 +7,117 @@ Author: Circuit Solver Project
 Date: 2025
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import multiprocessing
+import os
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import io
 import base64
 
 
+# Rendering this many plots or more is spread over a process pool.
+# Workers are forked (~22 ms each, plus ~6 ms of IPC per plot against
+# ~100 ms to render one), and each gets at least PLOTS_PER_WORKER
+# plots so its startup stays a small fraction of its work. Without
+# fork, workers would re-import the whole solver, so plots are
+# rendered serially.
+PARALLEL_MIN_PLOTS = 12
+PLOTS_PER_WORKER = 4
+
+# Figure, canvas and axes reused by every plot drawn in this process
+_figure = None
+
+# Rendered plots keyed by a hash of their data, most recently used last
+PNG_CACHE_SIZE = 256
+_png_cache = OrderedDict()
+
+
+def _init_worker():
+    """
+    Creates the figure, Agg canvas and axes reused for rendering.
+    
+    Runs once per worker process (as the pool initializer) or once in
+    the calling process for serial rendering.
+    """
+    global _figure
+    
+    fig = Figure(figsize=(8, 5), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    _figure = (fig, canvas, ax)
+
+
+def _render_one(job):
+    """
+    Renders one variable's plot to a base64-encoded PNG.
+    
+    Args:
+        job (tuple): (var_name, y_vals, time_points)
+    
+    Returns:
+        dict: {"name": var_name, "image": base64 PNG string}
+    """
+    var_name, y_vals, time_points = job
+    
+    if _figure is None:
+        _init_worker()
+    fig, canvas, ax = _figure
+    
+    # Draw plot
+    ax.cla()
+    ax.plot(time_points, y_vals, linewidth=2)
+    ax.set_title(f"{var_name} vs Time", fontsize=14, fontweight='bold')
+    ax.set_xlabel("Time (s)", fontsize=12)
+    ax.set_ylabel(var_name, fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    
+    # Encode as base64
+    buf = io.BytesIO()
+    canvas.print_png(buf)
+    img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+    
+    return {
+        "name": var_name,
+        "image": img_base64
+    }
+
+
+def _plot_key(job):
+    """
+    Hashes the name and data of one plot job.
+    
+    Args:
+        job (tuple): (var_name, y_vals, time_points)
+    
+    Returns:
+        str: SHA-256 hex digest of the plot's inputs
+    """
+    var_name, y_vals, time_points = job
+    h = hashlib.sha256(var_name.encode())
+    for arr in (y_vals, time_points):
+        h.update(str(arr.dtype).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
 def generate_plots(plot_data, time_points):
     """
     Generates time-domain plots and encodes them as base64 images.
     
     Creates a separate plot for each variable showing its variation
-    over time. Images are encoded in base64 format for embedding
-    in JSON responses.
+    over time. Each process reuses a single figure and Agg canvas,
+    clearing the axes between plots. Large batches are rendered in
+    parallel across a forked process pool where the platform supports
+    fork, and plots of data seen before are served from an in-memory
+    cache. Images are encoded in base64 format for embedding in JSON
+    responses.
     
     Args:
         plot_data (dict): Mapping of variable names to numerical arrays
@@ -31,33 +128,42 @@ def generate_plots(plot_data, time_points):
             - name: Variable name
             - image: Base64-encoded PNG image
     """
-    images = []
-    
-    for var_name, y_vals in plot_data.items():
-        # Skip if there was an error computing values
-        if isinstance(y_vals, str):
-            continue
-        
-        # Create plot
-        plt.figure(figsize=(8, 5))
-        plt.plot(time_points, y_vals, linewidth=2)
-        plt.title(f"{var_name} vs Time", fontsize=14, fontweight='bold')
-        plt.xlabel("Time (s)", fontsize=12)
-        plt.ylabel(var_name, fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        # Encode as base64
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        
-        images.append({
-            "name": var_name,
-            "image": img_base64
-        })
-        
-        plt.close()
-    
-    return images
+    # Skip variables where there was an error computing values
+    time_points = np.asarray(time_points)
+    jobs = [
+        (var_name, np.asarray(y_vals), time_points)
+        for var_name, y_vals in plot_data.items()
+        if not isinstance(y_vals, str)
+    ]
+    
+    # Only render plots missing from the cache
+    keys = [_plot_key(job) for job in jobs]
+    misses = [(key, job) for key, job in zip(keys, jobs) if key not in _png_cache]
+    
+    rendered = None
+    workers = min(len(misses) // PLOTS_PER_WORKER, os.cpu_count() or 1)
+    if (len(misses) >= PARALLEL_MIN_PLOTS and workers > 1
+            and 'fork' in multiprocessing.get_all_start_methods()):
+        try:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('fork'),
+                                     initializer=_init_worker) as ex:
+                rendered = list(ex.map(_render_one, [job for _, job in misses]))
+        except (OSError, BrokenProcessPool):
+            pass  # No process support or a worker died; render serially
+    if rendered is None:
+        rendered = [_render_one(job) for _, job in misses]
+    
+    images = {key: image for (key, _), image in zip(misses, rendered)}
+    for key in keys:
+        if key not in images:
+            images[key] = _png_cache[key]
+            _png_cache.move_to_end(key)
+    
+    # Store new plots, evicting the least recently used
+    for key, _ in misses:
+        _png_cache[key] = images[key]
+    while len(_png_cache) > PNG_CACHE_SIZE:
+        _png_cache.popitem(last=False)
+    
+    return [images[key] for key in keys]